@@ -25,17 +25,30 @@ CSVフォーマット（共通）:
 
   カラム名はプラットフォームごとに異なるため、
   --column-map オプションまたは config.json で指定可能。
+
+依存ライブラリ:
+  標準ライブラリのみで動作する。orjson がインストールされていれば
+  data.json の読み書きに使用する（出力内容は同一）。
 """
 
 import argparse
+import codecs
 import csv
+import itertools
 import json
+import math
 import os
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson が無い環境では標準の json で読み書きする
+    orjson = None
+
 # 各プラットフォームのデフォルトカラムマッピング
 # CSVのヘッダ名 → 内部キー名
 DEFAULT_COLUMN_MAPS = {
@@ -100,52 +113,116 @@ DEFAULT_COLUMN_MAPS = {
     },
 }
 
-WEEKDAY_MAP = {
-    0: "月",
-    1: "火",
-    2: "水",
-    3: "木",
-    4: "金",
-    5: "土",
-    6: "日",
+# data.json に出力する媒体の並び順
+PLATFORM_ORDER = ("google", "meta", "yahoo", "line")
+
+# datetime.weekday() の値（月曜=0）で引く曜日表記
+WEEKDAYS_JP = ("月", "火", "水", "木", "金", "土", "日")
+
+# 月次サマリーの指標（前月比の算出対象）
+SUMMARY_METRICS = (
+    "cost",
+    "impressions",
+    "clicks",
+    "conversions",
+    "ctr",
+    "cvr",
+    "cpc",
+    "cpa",
+)
+
+# Meta のトラフィック広告（CV集計から除外して別枠で出す）の結果タイプ
+TRAFFIC_RESULT_TYPES = {
+    "Instagramプロフィールへのアクセス",
+    "Instagram profile visits",
 }
 
+# CSVのエンコーディング候補（先頭から順に試す）
+ENCODINGS = ("utf-8-sig", "utf-8", "shift_jis", "cp932")
+# エンコーディング判定に読むファイル先頭のバイト数
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 数値セルから取り除く文字（桁区切り・通貨記号・パーセント）
+NUMBER_DELETE_TABLE = str.maketrans("", "", ",¥￥$%")
+
+# 日付フォーマット候補（よく使われる順）
+DATE_FORMATS = (
+    "%Y/%m/%d",
+    "%Y-%m-%d",
+    "%Y年%m月%d日",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y.%m.%d",
+)
+
+
+def detect_encodings(filepath, sample_size=ENCODING_SAMPLE_SIZE):
+    """ファイル先頭のサンプルだけを読み、デコードできるエンコーディング候補を返す。
+
+    サンプルは通っても以降でデコードに失敗することがあるため、
+    ENCODINGS のうちサンプルをデコードできたものをすべて優先順に返す。
+    """
+    with open(filepath, "rb") as f:
+        sample = f.read(sample_size)
+
+    candidates = []
+    for enc in ENCODINGS:
+        # サンプル末尾で多バイト文字が途切れていても失敗扱いにしない
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            decoder.decode(sample, final=False)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        candidates.append(enc)
+    return candidates
+
 
-def find_column(headers, candidates):
-    """ヘッダ行からカラム名を探す。候補リストの中で最初に見つかったものを返す。"""
+def detect_header_row(lines, min_fields=4):
+    """CSVヘッダ行の位置（読み飛ばす行数）を返す。
+
+    Google Ads等は先頭にタイトル行・期間行があるため、
+    カンマ区切りのフィールド数が多い行をヘッダとみなす。
+    """
+    skip_rows = 0
+    for line in lines:
+        stripped = line.strip()
+        if stripped == "" or stripped.startswith("#"):
+            skip_rows += 1
+        elif stripped.count(",") < min_fields - 1:
+            skip_rows += 1
+        else:
+            break
+    return skip_rows
+
+
+def find_column(header_index, candidates):
+    """ヘッダ索引からカラム名を探す。候補リストの中で最初に見つかったものを返す。
+
+    header_index は前後の空白を除いたヘッダ名 → 列位置の辞書
+    （同名のヘッダが複数ある場合は後ろの列の位置）。
+    """
     for candidate in candidates:
-        for header in headers:
-            if header.strip() == candidate:
-                return header.strip()
+        if candidate in header_index:
+            return candidate
     return None
 
 
 def parse_number(value):
     """文字列を数値に変換。カンマ・通貨記号を除去。"""
-    if value is None:
-        return 0
-    cleaned = str(value).replace(",", "").replace("¥", "").replace("￥", "")
-    cleaned = cleaned.replace("$", "").replace("%", "").strip()
-    if cleaned in ("", "--", "-", "N/A", "nan"):
-        return 0
+    cleaned = str(value).translate(NUMBER_DELETE_TABLE).strip()
     try:
-        return float(cleaned)
+        number = float(cleaned)
     except ValueError:
+        # "", "--", "-", "N/A" など
         return 0
+    # "nan" / "inf" は数値として扱わない
+    return number if math.isfinite(number) else 0
 
 
 def parse_date(value):
     """日付文字列をdatetimeに変換。複数のフォーマットに対応。"""
-    formats = [
-        "%Y/%m/%d",
-        "%Y-%m-%d",
-        "%Y年%m月%d日",
-        "%m/%d/%Y",
-        "%d/%m/%Y",
-        "%Y.%m.%d",
-    ]
     cleaned = str(value).strip()
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(cleaned, fmt)
         except ValueError:
@@ -153,50 +230,64 @@ def parse_date(value):
     raise ValueError(f"日付フォーマットを認識できません: {value}")
 
 
-def read_csv_file(filepath, platform, column_maps):
-    """CSVファイルを読み込み、統一フォーマットのレコードリストを返す。"""
+def read_csv_file(filepath, platform, column_maps, skip_rows=None):
+    """CSVファイルを読み込み、統一フォーマットのレコードリストを返す。
+
+    skip_rows を指定した場合はヘッダ行の自動検出を行わず、
+    先頭 skip_rows 行を読み飛ばした次の行をヘッダとみなす。
+    ファイル全体をメモリに読み込まず、1行ずつ csv.reader に流す。
+    """
     col_map = column_maps.get(platform, DEFAULT_COLUMN_MAPS.get(platform, {}))
-    records = []
 
-    encodings = ["utf-8-sig", "utf-8", "shift_jis", "cp932"]
-    content = None
+    candidates = detect_encodings(filepath)
+    if not candidates:
+        raise ValueError(f"ファイルのエンコーディングを検出できません: {filepath}")
 
-    for enc in encodings:
+    # サンプル以降でデコードに失敗した場合は次の候補で読み直す
+    for enc in candidates:
         try:
-            with open(filepath, "r", encoding=enc) as f:
-                content = f.read()
-            break
-        except (UnicodeDecodeError, UnicodeError):
-            continue
+            return read_csv_with_encoding(
+                filepath, enc, platform, col_map, skip_rows
+            )
+        except UnicodeDecodeError as e:
+            decode_error = e
 
-    if content is None:
-        raise ValueError(f"ファイルのエンコーディングを検出できません: {filepath}")
+    raise ValueError(
+        f"ファイルを {', '.join(candidates)} のいずれでもデコードできません: "
+        f"{filepath} ({decode_error})"
+    ) from decode_error
 
-    lines = content.splitlines()
 
-    # メタデータ行・空行をスキップしてCSVヘッダを探す
-    # Google Ads等は先頭にタイトル行・期間行があるため、
-    # カンマ区切りのフィールド数が多い行をヘッダとみなす
-    skip_rows = 0
-    min_fields = 4
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "" or stripped.startswith("#"):
-            skip_rows += 1
-        elif stripped.count(",") < min_fields - 1:
-            skip_rows += 1
-        else:
-            break
+def read_csv_with_encoding(filepath, enc, platform, col_map, skip_rows=None):
+    """指定したエンコーディングでCSVを読み込み、レコードリストを返す。"""
+    # メタデータ行・空行をスキップしてCSVヘッダを探す（ヘッダ行まで読めば止まる）
+    if skip_rows is None:
+        with open(filepath, "r", encoding=enc, newline="") as f:
+            skip_rows = detect_header_row(f)
+
+    with open(filepath, "r", encoding=enc, newline="") as f:
+        reader = csv.reader(itertools.islice(f, skip_rows, None))
+        return parse_csv_rows(reader, filepath, platform, col_map)
 
-    reader = csv.DictReader(lines[skip_rows:])
-    headers = reader.fieldnames
+
+def parse_csv_rows(reader, filepath, platform, col_map):
+    """ヘッダ行から始まる csv.reader を読み、統一フォーマットのレコードリストを返す。"""
+    records = []
+
+    headers = next(reader, None)
     if headers is None:
         raise ValueError(f"CSVヘッダが見つかりません: {filepath}")
 
+    # 前後の空白を除いたヘッダ名 → 列位置
+    # 重複時は csv.DictReader と同じく後ろの列を採用する
+    header_index = {}
+    for i, h in enumerate(headers):
+        header_index[h.strip()] = i
+
     # カラムマッピング解決
     resolved = {}
     for key, candidates in col_map.items():
-        col_name = find_column(headers, candidates)
+        col_name = find_column(header_index, candidates)
         if col_name is None:
             if key in ("date", "cost"):
                 raise ValueError(
@@ -207,51 +298,88 @@ def read_csv_file(filepath, platform, column_maps):
                 )
         resolved[key] = col_name
 
+    # 行ごとの辞書生成・キー検索を避けるため、カラム位置を事前に解決しておく
+    # 見つからなかった任意カラムは None とし、行ごとの参照を省く
+    idx = {
+        key: header_index[col_name]
+        for key, col_name in resolved.items()
+        if col_name
+    }
+    date_i = idx["date"]
+    cost_i = idx["cost"]
+    imp_i = idx.get("impressions")
+    clicks_i = idx.get("clicks")
+    cv_i = idx.get("conversions")
+    campaign_i = idx.get("campaign")
+    result_type_i = idx.get("result_type")
+    ad_name_i = idx.get("ad_name")
+    has_imp = imp_i is not None
+    has_clicks = clicks_i is not None
+    has_cv = cv_i is not None
+    has_campaign = campaign_i is not None
+    has_result_type = result_type_i is not None
+    has_ad_name = ad_name_i is not None
+    # 解決できたカラムを読むのに必要な列数（これより短い行だけ空セルで補う）
+    width = 1 + max(idx.values())
+
+    # 日付文字列 → (datetime, "YYYY-MM-DD", "YYYY-MM", 曜日)
+    # 同じ日付が行数分繰り返されるため、整形結果もファイル単位で使い回す
+    date_cache = {}
+
     for row in reader:
-        date_val = row.get(resolved.get("date"))
-        if date_val is None or str(date_val).strip() in ("", "合計", "Total"):
-            continue
+        if len(row) < width:
+            row += [""] * (width - len(row))
 
-        try:
-            dt = parse_date(date_val)
-        except ValueError:
+        date_val = row[date_i].strip()
+        if date_val in ("", "合計", "Total"):
             continue
 
+        date_info = date_cache.get(date_val)
+        if date_info is None:
+            try:
+                dt = parse_date(date_val)
+            except ValueError:
+                continue
+            date_str = dt.strftime("%Y-%m-%d")
+            date_info = date_cache[date_val] = (
+                dt,
+                date_str,
+                date_str[:7],
+                WEEKDAYS_JP[dt.weekday()],
+            )
+        dt, date_str, month_key, weekday_jp = date_info
+
         record = {
             "date": dt,
+            "date_str": date_str,
+            "month_key": month_key,
+            "weekday_jp": weekday_jp,
             "platform": platform,
             "campaign": (
-                row.get(resolved.get("campaign"), "").strip()
-                if resolved.get("campaign")
-                else "全体"
-            ),
-            "cost": round(parse_number(row.get(resolved.get("cost"), 0))),
-            "impressions": round(
-                parse_number(row.get(resolved.get("impressions"), 0))
+                sys.intern(row[campaign_i].strip()) if has_campaign else "全体"
             ),
-            "clicks": round(parse_number(row.get(resolved.get("clicks"), 0))),
-            "conversions": round(
-                parse_number(row.get(resolved.get("conversions"), 0))
+            "cost": round(parse_number(row[cost_i])),
+            "impressions": (
+                round(parse_number(row[imp_i])) if has_imp else 0
             ),
+            "clicks": round(parse_number(row[clicks_i])) if has_clicks else 0,
+            "conversions": round(parse_number(row[cv_i])) if has_cv else 0,
         }
 
         # Meta用の追加フィールド（結果タイプ、広告名）
-        if resolved.get("result_type"):
-            record["result_type"] = (
-                row.get(resolved["result_type"], "").strip()
-            )
-        if resolved.get("ad_name"):
-            record["ad_name"] = row.get(resolved["ad_name"], "").strip()
+        if has_result_type:
+            record["result_type"] = row[result_type_i].strip()
+        if has_ad_name:
+            record["ad_name"] = sys.intern(row[ad_name_i].strip())
 
         records.append(record)
 
     return records
 
 
-def get_week_number(dt, month_start):
-    """月初からの週番号を返す（1始まり）。"""
-    day_offset = (dt - month_start).days
-    return (day_offset // 7) + 1
+def get_week_number(dt):
+    """月初からの週番号を返す（1始まり）。1〜7日が第1週。"""
+    return (dt.day - 1) // 7 + 1
 
 
 def get_week_dates(year, month, week_num):
@@ -276,6 +404,18 @@ def safe_div(a, b):
     return a / b
 
 
+def add_metrics(totals, key, cost, impressions, clicks, conversions):
+    """totals[key] の [費用, 表示回数, クリック数, CV数] に加算する。"""
+    acc = totals.get(key)
+    if acc is None:
+        totals[key] = [cost, impressions, clicks, conversions]
+    else:
+        acc[0] += cost
+        acc[1] += impressions
+        acc[2] += clicks
+        acc[3] += conversions
+
+
 def calc_change(current, previous):
     """前期比の変化率（%）を算出。"""
     if previous == 0:
@@ -284,29 +424,37 @@ def calc_change(current, previous):
 
 
 def build_data_json(all_records, client_name, client_id, existing_data=None):
-    """全レコードからdata.json構造を構築する。"""
+    """全レコードからdata.json構造を構築する。
+
+    existing_data の各月データは複製せずにそのまま引き継ぐ。
+    レコードがある月は新しい dict で置き換え、引き継いだ月は
+    前月比（previousMonthChange / cpaChange）のみ上書きされる。
+    """
     # 既存データがあればベースにする
     if existing_data is not None:
-        data = {
-            "client": dict(existing_data.get("client", {})),
-            "months": {k: dict(v) for k, v in existing_data.get("months", {}).items()},
-        }
+        client = existing_data.get("client", {})
+        months = dict(existing_data.get("months", {}))
     else:
-        data = {"client": {"name": client_name, "id": client_id}, "months": {}}
+        client = {"name": client_name, "id": client_id}
+        months = {}
 
     # クライアント情報を更新
     if client_name:
-        data["client"] = {
-            **data["client"],
-            "name": client_name,
-            "id": client_id,
-        }
+        client = {**client, "name": client_name, "id": client_id}
+
+    data = {"client": client, "months": months}
+
+    # 媒体名 → 小さな整数ID（集計キーの文字列ハッシュを避ける）
+    # ID順が出力順になるよう、既知の媒体は PLATFORM_ORDER 順に採番し、
+    # 未知の媒体は出現順に後ろへ追加する
+    pf_ids = {pf: i for i, pf in enumerate(PLATFORM_ORDER)}
+    pf_names = list(PLATFORM_ORDER)
+    meta_id = pf_ids["meta"]
 
     # 月ごとにグループ化
     months_data = defaultdict(list)
     for rec in all_records:
-        month_key = rec["date"].strftime("%Y-%m")
-        months_data[month_key].append(rec)
+        months_data[rec["month_key"]].append(rec)
 
     sorted_month_keys = sorted(months_data.keys())
 
@@ -314,23 +462,67 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
         records = months_data[month_key]
         year = int(month_key[:4])
         month = int(month_key[5:7])
-        month_start = datetime(year, month, 1)
 
-        # --- 月次集計（トラフィック広告を除外） ---
-        traffic_types = {
-            "Instagramプロフィールへのアクセス",
-            "Instagram profile visits",
-        }
-        conv_only = [
-            r
-            for r in records
-            if r.get("result_type", "") not in traffic_types
-        ]
-        month_cost = sum(r["cost"] for r in conv_only)
-        month_imp = sum(r["impressions"] for r in conv_only)
-        month_clicks = sum(r["clicks"] for r in conv_only)
-        month_cv = sum(r["conversions"] for r in conv_only)
+        # --- 1回の走査で全階層を集計 ---
+        # 集計値はすべて [費用, 表示回数, クリック数, CV数] のリスト。
+        # 月次・週次・日別・週別媒体はトラフィック広告を除外し、
+        # 媒体別・キャンペーン別は Meta のみトラフィック広告を除外する。
+        month_totals = [0, 0, 0, 0]
+        pf_totals = {}
+        camp_totals = {}
+        ad_totals = {}
+        traffic_totals = {}
+        traffic_result_types = {}
+        week_totals = {}
+        daily_totals = {}
+        daily_weekdays = {}
+        week_pf_totals = {}
 
+        for r in records:
+            pf_id = pf_ids.get(r["platform"])
+            if pf_id is None:
+                pf_id = pf_ids[r["platform"]] = len(pf_names)
+                pf_names.append(r["platform"])
+            wn = get_week_number(r["date"])
+            cost = r["cost"]
+            imp = r["impressions"]
+            clicks = r["clicks"]
+            cv = r["conversions"]
+            result_type = r.get("result_type", "")
+            is_traffic = result_type in TRAFFIC_RESULT_TYPES
+
+            # 週は（トラフィックのみでも）レコードがあれば出力する
+            if wn not in week_totals:
+                week_totals[wn] = [0, 0, 0, 0]
+
+            if pf_id == meta_id and is_traffic:
+                add_metrics(pf_totals, pf_id, 0, 0, 0, 0)
+                add_metrics(traffic_totals, pf_id, cost, imp, clicks, cv)
+                traffic_result_types.setdefault(pf_id, result_type)
+            else:
+                add_metrics(pf_totals, pf_id, cost, imp, clicks, cv)
+                camp = r["campaign"]
+                add_metrics(camp_totals, (pf_id, camp), cost, imp, clicks, cv)
+                if pf_id == meta_id:
+                    ad_key = (pf_id, camp, r.get("ad_name", camp))
+                    add_metrics(ad_totals, ad_key, cost, imp, clicks, cv)
+
+            if is_traffic:
+                continue
+
+            month_totals[0] += cost
+            month_totals[1] += imp
+            month_totals[2] += clicks
+            month_totals[3] += cv
+            add_metrics(week_totals, wn, cost, imp, clicks, cv)
+            day_key = (wn, r["date_str"])
+            if day_key not in daily_totals:
+                daily_weekdays[day_key] = r["weekday_jp"]
+            add_metrics(daily_totals, day_key, cost, imp, clicks, cv)
+            add_metrics(week_pf_totals, (wn, pf_id), cost, imp, clicks, cv)
+
+        # --- 月次集計（トラフィック広告を除外） ---
+        month_cost, month_imp, month_clicks, month_cv = month_totals
         month_summary = {
             "cost": month_cost,
             "impressions": month_imp,
@@ -343,51 +535,22 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
         }
 
         # --- プラットフォーム別 ---
-        platform_records = defaultdict(list)
-        for r in records:
-            platform_records[r["platform"]].append(r)
+        campaigns_by_pf = defaultdict(list)
+        for pf_id, camp_name in sorted(camp_totals):
+            campaigns_by_pf[pf_id].append(camp_name)
 
-        platforms = {}
-        for pf, pf_records in platform_records.items():
-            # Meta: トラフィック広告を分離
-            is_meta = pf == "meta"
-            traffic_types = {
-                "Instagramプロフィールへのアクセス",
-                "Instagram profile visits",
-            }
+        ads_by_campaign = defaultdict(list)
+        for pf_id, camp_name, ad_name in sorted(ad_totals):
+            ads_by_campaign[(pf_id, camp_name)].append(ad_name)
 
-            if is_meta:
-                conv_records = [
-                    r
-                    for r in pf_records
-                    if r.get("result_type", "") not in traffic_types
-                ]
-                traffic_records = [
-                    r
-                    for r in pf_records
-                    if r.get("result_type", "") in traffic_types
-                ]
-            else:
-                conv_records = pf_records
-                traffic_records = []
-
-            pf_cost = sum(r["cost"] for r in conv_records)
-            pf_imp = sum(r["impressions"] for r in conv_records)
-            pf_clicks = sum(r["clicks"] for r in conv_records)
-            pf_cv = sum(r["conversions"] for r in conv_records)
+        platforms = {}
+        for pf_id in sorted(pf_totals):
+            pf_cost, pf_imp, pf_clicks, pf_cv = pf_totals[pf_id]
 
             # キャンペーン（広告セット）別
-            campaign_records = defaultdict(list)
-            for r in conv_records:
-                campaign_records[r["campaign"]].append(r)
-
             campaigns = []
-            for camp_name, camp_recs in sorted(campaign_records.items()):
-                c_cost = sum(r["cost"] for r in camp_recs)
-                c_imp = sum(r["impressions"] for r in camp_recs)
-                c_clicks = sum(r["clicks"] for r in camp_recs)
-                c_cv = sum(r["conversions"] for r in camp_recs)
-
+            for camp_name in campaigns_by_pf[pf_id]:
+                c_cost, c_imp, c_clicks, c_cv = camp_totals[(pf_id, camp_name)]
                 camp_data = {
                     "name": camp_name,
                     "cost": c_cost,
@@ -398,18 +561,15 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
                 }
 
                 # Meta: 広告別の内訳を追加
-                if is_meta:
-                    ad_records = defaultdict(list)
-                    for r in camp_recs:
-                        ad_key = r.get("ad_name", camp_name)
-                        ad_records[ad_key].append(r)
-
+                ad_names = ads_by_campaign.get((pf_id, camp_name), [])
+                if len(ad_names) > 1 or (
+                    len(ad_names) == 1 and ad_names[0] != camp_name
+                ):
                     ads = []
-                    for ad_name, ad_recs in sorted(ad_records.items()):
-                        a_cost = sum(r["cost"] for r in ad_recs)
-                        a_imp = sum(r["impressions"] for r in ad_recs)
-                        a_clicks = sum(r["clicks"] for r in ad_recs)
-                        a_cv = sum(r["conversions"] for r in ad_recs)
+                    for ad_name in ad_names:
+                        a_cost, a_imp, a_clicks, a_cv = ad_totals[
+                            (pf_id, camp_name, ad_name)
+                        ]
                         ads.append(
                             {
                                 "name": ad_name,
@@ -420,10 +580,7 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
                                 "cpa": int(safe_div(a_cost, a_cv)),
                             }
                         )
-                    if len(ads) > 1 or (
-                        len(ads) == 1 and ads[0]["name"] != camp_name
-                    ):
-                        camp_data["ads"] = ads
+                    camp_data["ads"] = ads
 
                 campaigns.append(camp_data)
 
@@ -440,117 +597,64 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
             }
 
             # Meta: トラフィック広告を別枠で追加
-            if is_meta and traffic_records:
-                t_cost = sum(r["cost"] for r in traffic_records)
-                t_imp = sum(r["impressions"] for r in traffic_records)
-                t_clicks = sum(r["clicks"] for r in traffic_records)
-                t_results = sum(r["conversions"] for r in traffic_records)
-                result_type = next(
-                    (
-                        r.get("result_type", "")
-                        for r in traffic_records
-                        if r.get("result_type")
-                    ),
-                    "",
-                )
+            if pf_id in traffic_totals:
+                t_cost, t_imp, t_clicks, t_results = traffic_totals[pf_id]
                 pf_data["traffic"] = {
                     "name": "トラフィック",
                     "cost": t_cost,
                     "impressions": t_imp,
                     "clicks": t_clicks,
                     "results": t_results,
-                    "resultType": result_type,
+                    "resultType": traffic_result_types[pf_id],
                 }
 
-            platforms[pf] = pf_data
+            platforms[pf_names[pf_id]] = pf_data
 
         # --- 週次集計 ---
-        week_groups = defaultdict(list)
-        for r in records:
-            wn = get_week_number(r["date"], month_start)
-            week_groups[wn].append(r)
+        daily_by_week = defaultdict(list)
+        for wn, day_key in sorted(daily_totals):
+            daily_by_week[wn].append(day_key)
+
+        week_pfs = defaultdict(list)
+        for wn, pf_id in sorted(week_pf_totals):
+            week_pfs[wn].append(pf_id)
 
         weeks = {}
-        for wn in sorted(week_groups.keys()):
-            w_records = week_groups[wn]
+        for wn in sorted(week_totals):
             w_start, w_end = get_week_dates(year, month, wn)
+            w_cost, w_imp, w_clicks, w_cv = week_totals[wn]
 
-            w_conv_only = [
-                r
-                for r in w_records
-                if r.get("result_type", "") not in traffic_types
-            ]
-            w_cost = sum(r["cost"] for r in w_conv_only)
-            w_imp = sum(r["impressions"] for r in w_conv_only)
-            w_clicks = sum(r["clicks"] for r in w_conv_only)
-            w_cv = sum(r["conversions"] for r in w_conv_only)
-
-            # 日別データ集計（トラフィック除外）
-            daily_map = defaultdict(
-                lambda: {
-                    "cost": 0,
-                    "impressions": 0,
-                    "clicks": 0,
-                    "conversions": 0,
-                }
-            )
-            for r in w_conv_only:
-                day_key = r["date"].strftime("%Y-%m-%d")
-                daily_map[day_key]["cost"] += r["cost"]
-                daily_map[day_key]["impressions"] += r["impressions"]
-                daily_map[day_key]["clicks"] += r["clicks"]
-                daily_map[day_key]["conversions"] += r["conversions"]
-                daily_map[day_key]["_dt"] = r["date"]
-
+            # 日別データ（トラフィック除外）
             daily = []
-            for day_key in sorted(daily_map.keys()):
-                d = daily_map[day_key]
-                dt = d.get("_dt", parse_date(day_key))
+            for day_key in daily_by_week[wn]:
+                cost, imp, clicks, cv = daily_totals[(wn, day_key)]
                 daily.append(
                     {
                         "date": day_key,
-                        "dayOfWeek": WEEKDAY_MAP[dt.weekday()],
-                        "cost": d["cost"],
-                        "impressions": d["impressions"],
-                        "clicks": d["clicks"],
-                        "conversions": d["conversions"],
+                        "dayOfWeek": daily_weekdays[(wn, day_key)],
+                        "cost": cost,
+                        "impressions": imp,
+                        "clicks": clicks,
+                        "conversions": cv,
                     }
                 )
 
             # 週別の媒体別集計（トラフィック除外）
-            week_platform_data = defaultdict(
-                lambda: {
-                    "cost": 0,
-                    "impressions": 0,
-                    "clicks": 0,
-                    "conversions": 0,
-                }
-            )
-            for r in w_conv_only:
-                wp = week_platform_data[r["platform"]]
-                wp["cost"] += r["cost"]
-                wp["impressions"] += r["impressions"]
-                wp["clicks"] += r["clicks"]
-                wp["conversions"] += r["conversions"]
-
             week_platforms = {}
-            for pf_name, wp in week_platform_data.items():
-                week_platforms[pf_name] = {
-                    "cost": wp["cost"],
-                    "impressions": wp["impressions"],
-                    "clicks": wp["clicks"],
-                    "conversions": wp["conversions"],
-                    "ctr": round(
-                        safe_div(wp["clicks"], wp["impressions"]) * 100, 2
-                    ),
-                    "cvr": round(
-                        safe_div(wp["conversions"], wp["clicks"]) * 100, 2
-                    ),
-                    "cpa": int(safe_div(wp["cost"], wp["conversions"])),
+            for pf_id in week_pfs[wn]:
+                cost, imp, clicks, cv = week_pf_totals[(wn, pf_id)]
+                week_platforms[pf_names[pf_id]] = {
+                    "cost": cost,
+                    "impressions": imp,
+                    "clicks": clicks,
+                    "conversions": cv,
+                    "ctr": round(safe_div(clicks, imp) * 100, 2),
+                    "cvr": round(safe_div(cv, clicks) * 100, 2),
+                    "cpa": int(safe_div(cost, cv)),
                 }
 
             date_format = "%Y-%m-%d"
-            weeks[f"week{wn}"] = {
+            week_data = {
                 "dates": f"{w_start.strftime(date_format)} ~ {w_end.strftime(date_format)}",
                 "summary": {
                     "cost": w_cost,
@@ -560,13 +664,10 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
                     "cpa": int(safe_div(w_cost, w_cv)),
                 },
                 "daily": daily,
-                "platforms": week_platforms if week_platforms else None,
             }
-
-        # 週別データからplatformsがNoneのものを除去
-        for wk_key, wk_val in weeks.items():
-            if wk_val.get("platforms") is None:
-                del wk_val["platforms"]
+            if week_platforms:
+                week_data["platforms"] = week_platforms
+            weeks[f"week{wn}"] = week_data
 
         month_data = {
             "summary": month_summary,
@@ -578,42 +679,25 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
         data["months"][month_key] = month_data
 
     # --- 前月比の計算 ---
-    all_month_keys = sorted(data["months"].keys())
-    for i, mk in enumerate(all_month_keys):
-        if i == 0:
-            data["months"][mk]["previousMonthChange"] = {
-                "cost": 0,
-                "impressions": 0,
-                "clicks": 0,
-                "conversions": 0,
-                "ctr": 0,
-                "cvr": 0,
-                "cpc": 0,
-                "cpa": 0,
-            }
-            continue
+    all_month_keys = sorted(months.keys())
+    if all_month_keys:
+        months[all_month_keys[0]]["previousMonthChange"] = dict.fromkeys(
+            SUMMARY_METRICS, 0
+        )
 
-        prev_mk = all_month_keys[i - 1]
-        curr = data["months"][mk]["summary"]
-        prev = data["months"][prev_mk]["summary"]
+    for prev_mk, mk in zip(all_month_keys, all_month_keys[1:]):
+        curr = months[mk]["summary"]
+        prev = months[prev_mk]["summary"]
 
-        data["months"][mk]["previousMonthChange"] = {
-            "cost": calc_change(curr["cost"], prev["cost"]),
-            "impressions": calc_change(curr["impressions"], prev["impressions"]),
-            "clicks": calc_change(curr["clicks"], prev["clicks"]),
-            "conversions": calc_change(
-                curr["conversions"], prev["conversions"]
-            ),
-            "ctr": calc_change(curr["ctr"], prev["ctr"]),
-            "cvr": calc_change(curr["cvr"], prev["cvr"]),
-            "cpc": calc_change(curr["cpc"], prev["cpc"]),
-            "cpa": calc_change(curr["cpa"], prev["cpa"]),
+        months[mk]["previousMonthChange"] = {
+            metric: calc_change(curr[metric], prev[metric])
+            for metric in SUMMARY_METRICS
         }
 
         # プラットフォーム別CPA変化率
-        for pf in data["months"][mk].get("platforms", {}):
-            curr_pf = data["months"][mk]["platforms"][pf]
-            prev_pf = data["months"][prev_mk].get("platforms", {}).get(pf)
+        prev_platforms = months[prev_mk].get("platforms", {})
+        for pf, curr_pf in months[mk].get("platforms", {}).items():
+            prev_pf = prev_platforms.get(pf)
             if prev_pf:
                 curr_pf["cpaChange"] = calc_change(
                     curr_pf["cpa"], prev_pf["cpa"]
@@ -622,6 +706,38 @@ def build_data_json(all_records, client_name, client_id, existing_data=None):
     return data
 
 
+def read_json(path):
+    """既存の data.json を読み込む。orjson があれば使い、無ければ標準の json を使う。"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """data.json を書き出す。orjson があれば使い、無ければ標準の json を使う。"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def non_negative_int(value):
+    """argparse 用: 0以上の整数を受け付ける。"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"0以上の値を指定してください: {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="広告CSVデータ → data.json 変換ツール",
@@ -682,6 +798,25 @@ def main():
         help="カラムマッピング設定ファイル（JSON）",
     )
 
+    parser.add_argument(
+        "--skip-rows",
+        type=non_negative_int,
+        metavar="N",
+        help="ヘッダ行の前にある行数（指定時はヘッダ行の自動検出を行わない）",
+    )
+    for platform in PLATFORM_ORDER:
+        parser.add_argument(
+            f"--{platform}-skip-rows",
+            type=non_negative_int,
+            metavar="N",
+            help=f"{platform} のCSVのみ --skip-rows を上書き",
+        )
+    parser.add_argument(
+        "--no-sniff",
+        action="store_true",
+        help="ヘッダ行の自動検出を行わず、1行目をヘッダとみなす",
+    )
+
     args = parser.parse_args()
 
     # CSVファイルが1つも指定されていない場合
@@ -717,26 +852,58 @@ def main():
     existing_data = None
     if args.merge and os.path.exists(args.output):
         try:
-            with open(args.output, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
+            existing_data = read_json(args.output)
             print(f"既存データを読み込みました: {args.output}")
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"既存データの読み込みに失敗（新規作成します）: {e}")
 
-    # CSV読み込み
-    all_records = []
+    # ファイルの存在を事前に確認
     for platform, filepath in active_platforms.items():
         if not os.path.exists(filepath):
             print(f"ファイルが見つかりません: {filepath}", file=sys.stderr)
             sys.exit(1)
 
-        try:
-            records = read_csv_file(filepath, platform, column_maps)
+    # ヘッダ位置の指定（媒体別 > 共通 > --no-sniff の順に優先）
+    default_skip_rows = args.skip_rows
+    if default_skip_rows is None and args.no_sniff:
+        default_skip_rows = 0
+    skip_rows_by_platform = {}
+    for platform in active_platforms:
+        skip_rows = getattr(args, f"{platform}_skip_rows")
+        if skip_rows is None:
+            skip_rows = default_skip_rows
+        skip_rows_by_platform[platform] = skip_rows
+
+    # CSV読み込み（媒体ごとのファイルを並行して読み込む）
+    all_records = []
+    with ThreadPoolExecutor(max_workers=len(active_platforms)) as executor:
+        futures = {
+            platform: executor.submit(
+                read_csv_file,
+                filepath,
+                platform,
+                column_maps,
+                skip_rows_by_platform[platform],
+            )
+            for platform, filepath in active_platforms.items()
+        }
+        # ログとレコードの並びを安定させるため、結果は指定順に受け取る
+        failed = False
+        for platform, future in futures.items():
+            filepath = active_platforms[platform]
+            try:
+                records = future.result()
+            except ValueError as e:
+                print(f"エラー [{platform}]: {e}", file=sys.stderr)
+                # 未着手の読み込みは取り消し、with を抜けてから終了する
+                executor.shutdown(wait=False, cancel_futures=True)
+                failed = True
+                break
             all_records.extend(records)
             print(f"  {platform}: {len(records)}行 読み込み ({filepath})")
-        except ValueError as e:
-            print(f"エラー [{platform}]: {e}", file=sys.stderr)
-            sys.exit(1)
+
+    if failed:
+        sys.exit(1)
 
     if not all_records:
         print("有効なデータが見つかりませんでした。", file=sys.stderr)
@@ -755,8 +922,7 @@ def main():
     if output_dir:
         os.makedirs(output_dir, exist_ok=True)
 
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_json(args.output, data)
 
     months = sorted(data["months"].keys())
     total_weeks = sum(